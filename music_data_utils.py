@@ -12,79 +12,159 @@ Formato de Token: "ON=pitch1,pitch2;OFF=pitch3;DUR=tiempo"
 """
 
 from music21 import midi, note, chord, stream, tempo, instrument
-from collections import defaultdict
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Iterator, Optional
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
 import warnings
-import statistics
+import re
+import os
+import numpy as np
 
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError: # numba es opcional: sin él se usa el bucle de tokenización en Python puro
+    _NUMBA_AVAILABLE = False
 
-def snap_to_grid(duration):
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import symusic
+except ImportError: # symusic es opcional: solo se requiere para la lectura rápida (backend='symusic')
+    symusic = None
+
+
+# Resolución temporal interna (ticks por negra). Divisible por 8 (grid binario) y por 12 (grid
+# ternario), y múltiplo de las resoluciones MIDI habituales (96, 120, 192, 240, 480).
+TICKS_PER_QUARTER = 960
+_GRID_BINARY_TICKS = TICKS_PER_QUARTER // 8 # Base 1/32 - Fusa
+_GRID_TERNARY_TICKS = TICKS_PER_QUARTER // 12 # Base 1/48 - Tresillo de Fusa
+_NOISE_THRESHOLD_TICKS = 0.04 * TICKS_PER_QUARTER # Menos de media fusa de tresillo
+
+
+def _snap_ticks_array(durations) -> np.ndarray:
     """
-    Aplica una Cuantización Inteligente Híbrida a una duración dada.
+    Aplica la Cuantización Inteligente Híbrida sobre duraciones enteras en ticks (versión vectorizada).
+
+    Args:
+        durations (array-like): Duraciones en ticks (`TICKS_PER_QUARTER` por negra).
+
+    Returns:
+        np.ndarray: Las duraciones cuantizadas (en ticks) al grid que produzca el menor error.
+                    Las duraciones menores al umbral de ruido se llevan a 0.
+    """
+    durations = np.asarray(durations, dtype=np.int64)
+
+    # Grid A: Binario (Base 1/32 - Fusa)
+    snapped_bin = np.round(durations / _GRID_BINARY_TICKS).astype(np.int64) * _GRID_BINARY_TICKS
+    error_bin = np.abs(durations - snapped_bin)
+
+    # Grid B: Ternario (Base 1/48 - Tresillo de Fusa)
+    snapped_ter = np.round(durations / _GRID_TERNARY_TICKS).astype(np.int64) * _GRID_TERNARY_TICKS
+    error_ter = np.abs(durations - snapped_ter)
+
+    # Gana el que tenga menos error
+    snapped = np.where(error_bin <= error_ter, snapped_bin, snapped_ter)
+
+    # Umbral de seguridad
+    snapped[durations < _NOISE_THRESHOLD_TICKS] = 0
+    return snapped
+
+
+@njit(inline='always')
+def _snap_ticks(duration):
+    """
+    Versión escalar de `_snap_ticks_array` (compilada con numba si está disponible).
+    """
+    if duration < _NOISE_THRESHOLD_TICKS:
+        return 0
+    snapped_bin = round(duration / _GRID_BINARY_TICKS) * _GRID_BINARY_TICKS
+    snapped_ter = round(duration / _GRID_TERNARY_TICKS) * _GRID_TERNARY_TICKS
+    if abs(duration - snapped_bin) <= abs(duration - snapped_ter):
+        return snapped_bin
+    return snapped_ter
+
+
+def snap_to_grid_array(durations) -> np.ndarray:
+    """
+    Aplica una Cuantización Inteligente Híbrida a un arreglo de duraciones (versión vectorizada).
     
     El algoritmo compara el error de ajuste contra dos grillas:
     1. Binaria: Base 1/32 (Fusas).
     2. Ternaria: Base 1/48 (Tresillos de Fusa).
     
     Args:
-        duration (float): Duración del evento en 'quarter lengths' (tiempos de negra).
+        durations (array-like): Duraciones de los eventos en 'quarter lengths' (tiempos de negra).
 
     Returns:
-        float: La duración cuantizada al grid que produzca el menor error. 
-               Retorna 0.0 si la duración es menor al umbral de ruido (0.04).
+        np.ndarray: Las duraciones cuantizadas al grid que produzca el menor error en cada posición.
+                    Las duraciones menores al umbral de ruido (0.04) se llevan a 0.0.
     """
-    
+    durations = np.asarray(durations, dtype=np.float64)
+
     # Grid A: Binario (Base 1/32 - Fusa)
     grid_binary = 0.125
-    steps_bin = round(duration / grid_binary)
-    snapped_bin = steps_bin * grid_binary
-    error_bin = abs(duration - snapped_bin)
+    snapped_bin = np.round(durations / grid_binary) * grid_binary
+    error_bin = np.abs(durations - snapped_bin)
     
     # Grid B: Ternario (Base 1/48 - Tresillo de Fusa)
     grid_ternary = 1.0 / 12.0 
-    steps_ter = round(duration / grid_ternary)
-    snapped_ter = steps_ter * grid_ternary
-    error_ter = abs(duration - snapped_ter)
+    snapped_ter = np.round(durations / grid_ternary) * grid_ternary
+    error_ter = np.abs(durations - snapped_ter)
     
-    # Umbral de seguridad:
-    if duration < 0.04: # Menos de media fusa de tresillo
-        return 0.0
-
     # Gana el que tenga menos error
-    if error_bin <= error_ter:
-        return round(snapped_bin, 3)
-    else:
-        return round(snapped_ter, 3)
+    snapped = np.where(error_bin <= error_ter, np.round(snapped_bin, 3), np.round(snapped_ter, 3))
+
+    # Umbral de seguridad: Menos de media fusa de tresillo
+    snapped[durations < 0.04] = 0.0
+    return snapped
 
 
-def _extract_raw_events(score) -> List[Tuple[float, float, List[int]]]:
+def snap_to_grid(duration):
     """
-    Extrae una lista lineal de eventos musicales (Notas y Acordes) desde un Score de music21.
+    Aplica una Cuantización Inteligente Híbrida a una duración dada.
+    Envoltorio escalar de `snap_to_grid_array`, se mantiene por compatibilidad.
     
     Args:
-        score (music21.stream.Score): El objeto partitura parseado previamente.
+        duration (float): Duración del evento en 'quarter lengths' (tiempos de negra).
 
     Returns:
-        List[Tuple[float, float, List[int]]]: Lista de tuplas. Cada tupla contiene:
-            - offset (float): Tiempo de inicio.
-            - duration (float): Duración del evento.
-            - pitches (List[int]): Lista de números MIDI (0-127) activos en ese evento.
+        float: La duración cuantizada al grid que produzca el menor error. 
+               Retorna 0.0 si la duración es menor al umbral de ruido (0.04).
     """
-    raw_events = []
-    flat_score = score.flatten()
-    elements = [e for e in flat_score if isinstance(e, (chord.Chord, note.Note))]
+    return float(snap_to_grid_array([duration])[0])
+
+
+def _extract_raw_events(flat_score) -> List[Tuple[int, int, List[int]]]:
+    """
+    Extrae una lista lineal de eventos musicales (Notas y Acordes) desde un Score de music21 aplanado.
+    Los tiempos se convierten a ticks enteros (`TICKS_PER_QUARTER` por negra) para evitar
+    claves flotantes y errores de redondeo acumulados en la tokenización.
     
-    for element in elements:
-        pitches = []
-        if isinstance(element, chord.Chord):
-            pitches = [p.midi for p in element.pitches]
-        elif isinstance(element, note.Note):
-            pitches = [element.pitch.midi]
-            
-        offset = float(element.offset)
-        duration = float(element.quarterLength)
-        raw_events.append((offset, duration, pitches))
-        
+    Args:
+        flat_score (music21.stream.Stream): La partitura parseada previamente, ya aplanada con `flatten()`.
+
+    Returns:
+        List[Tuple[int, int, List[int]]]: Lista de tuplas. Cada tupla contiene:
+            - offset (int): Tiempo de inicio en ticks.
+            - duration (int): Duración del evento en ticks.
+            - pitches (List[int]): Lista de números MIDI (0-127) activos en ese evento.
+    """
+    # Filtrado por clase delegado al iterador indexado de music21
+    elements = flat_score.getElementsByClass((chord.Chord, note.Note))
+
+    raw_events = [
+        (
+            int(round(float(element.offset) * TICKS_PER_QUARTER)),
+            int(round(float(element.quarterLength) * TICKS_PER_QUARTER)),
+            [p.midi for p in element.pitches] if isinstance(element, chord.Chord) else [element.pitch.midi],
+        )
+        for element in elements
+    ]
     return raw_events
 
 
@@ -99,17 +179,203 @@ def _get_pitch_median(raw_events) -> int:
     Returns:
         int: El valor MIDI mediano. Retorna 60 (Do central) si la lista está vacía.
     """
-    all_pitches = []
-    for _, _, pitches in raw_events:
-        all_pitches.extend(pitches)
-    
-    if not all_pitches:
+    total = sum(len(pitches) for _, _, pitches in raw_events)
+    if total == 0:
         return 60 # Default seguro si el midi está vacío
-        
-    return int(statistics.median(all_pitches))
+
+    all_pitches = np.fromiter(chain.from_iterable(pitches for _, _, pitches in raw_events), dtype=np.int16, count=total)
+
+    # Selección O(N) con np.partition en lugar de ordenar toda la lista
+    mid = total // 2
+    if total % 2:
+        return int(np.partition(all_pitches, mid)[mid])
+    lower, upper = np.partition(all_pitches, [mid - 1, mid])[mid - 1:mid + 1]
+    return int((int(lower) + int(upper)) / 2) # Promedio de los dos centrales, como statistics.median
+
+
+def _precompute_timing(raw_events):
+    """
+    Construye el esqueleto temporal de la pieza, invariante ante transposiciones.
+    
+    Permite reutilizar el ordenamiento de tiempos y la agrupación de eventos entre las
+    12 tonalidades del Data Augmentation, re-mapeando únicamente los pitches.
+    Los inicios y finales se guardan como arreglos (tiempo, pitch) ordenados por tiempo y
+    se segmentan por punto temporal con `np.searchsorted`.
+
+    Args:
+        raw_events (List[Tuple]): Lista de eventos (offset, duration, pitches).
+
+    Returns:
+        Tuple: Una tupla con:
+            - all_times (np.ndarray): Puntos temporales únicos (inicios y finales, en ticks) ordenados.
+            - on_ptr (np.ndarray): Límites (n+1) del segmento de `on_pitches` de cada punto temporal.
+            - on_pitches (np.ndarray): Pitches de las notas ordenados por tiempo de inicio.
+            - off_ptr (np.ndarray): Límites (n+1) del segmento de `off_pitches` de cada punto temporal.
+            - off_pitches (np.ndarray): Pitches de las notas ordenados por tiempo de final.
+            - pitch_range (Tuple[int, int]): Pitch mínimo y máximo de la pieza.
+    """
+    event_dtype = [('t', np.int64), ('p', np.int16)]
+    on_arr = np.array([(offset, p) for offset, _, pitches in raw_events for p in pitches], dtype=event_dtype)
+    off_arr = np.array([(offset + duration, p) for offset, duration, pitches in raw_events for p in pitches], dtype=event_dtype)
+    on_arr.sort(order='t')
+    off_arr.sort(order='t')
+
+    all_times = np.unique(np.concatenate([on_arr['t'], off_arr['t']]))
+    on_ptr = np.append(np.searchsorted(on_arr['t'], all_times), len(on_arr))
+    off_ptr = np.append(np.searchsorted(off_arr['t'], all_times), len(off_arr))
+
+    pitch_range = (int(on_arr['p'].min()), int(on_arr['p'].max())) if len(on_arr) else (0, 127)
+
+    return all_times, on_ptr, np.ascontiguousarray(on_arr['p']), off_ptr, np.ascontiguousarray(off_arr['p']), pitch_range
+
+
+def _transpose_segments(ptr, pitches, semitones):
+    """
+    Transporta los pitches de un esqueleto temporal descartando los que salen del rango MIDI (0-127).
+
+    Args:
+        ptr (np.ndarray): Límites (n+1) del segmento de cada punto temporal.
+        pitches (np.ndarray): Pitches ordenados por tiempo.
+        semitones (int): Desplazamiento en semitonos.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Los límites recalculados y los pitches válidos ya transportados.
+    """
+    new_pitches = pitches + semitones
+    valid = (new_pitches >= 0) & (new_pitches <= 127)
+    kept = np.concatenate([[0], np.cumsum(valid)]) # Notas válidas acumuladas antes de cada posición
+    return kept[ptr], new_pitches[valid]
+
+
+@njit(cache=True)
+def _tokenize_kernel(times, on_end, on_pitches, off_end, off_pitches):
+    """
+    Máquina de estados de tokenización sobre arreglos enteros (compilada con numba si está disponible).
+    El código compilado se guarda en caché en disco, por lo que solo se compila en la primera ejecución.
+
+    Los pitches pendientes se representan como máscaras de 128 bits (dos palabras uint64 por fila).
+
+    Args:
+        times (np.ndarray): Puntos temporales en ticks (con al menos una nota válida) ordenados.
+        on_end (np.ndarray): Fin del segmento de `on_pitches` que inicia en cada punto temporal.
+        on_pitches (np.ndarray): Pitches válidos ordenados por tiempo de inicio.
+        off_end (np.ndarray): Fin del segmento de `off_pitches` que termina en cada punto temporal.
+        off_pitches (np.ndarray): Pitches válidos ordenados por tiempo de final.
+
+    Los segmentos son contiguos, por lo que se recorren como dos flujos ordenados (merge) con
+    punteros que solo avanzan.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Por cada token emitido, la máscara ON (n, 2),
+        la máscara OFF (n, 2) y la duración cuantizada en ticks (n,).
+    """
+    n_times = times.shape[0]
+    out_on = np.zeros((n_times, 2), dtype=np.uint64)
+    out_off = np.zeros((n_times, 2), dtype=np.uint64)
+    out_dur = np.zeros(n_times, dtype=np.int64)
+    if n_times == 0:
+        return out_on, out_off, out_dur
+
+    note_count = np.zeros(128, dtype=np.int64)
+    pending_on = np.zeros(2, dtype=np.uint64)
+    pending_off = np.zeros(2, dtype=np.uint64)
+    one = np.uint64(1)
+    n_out = 0
+    i_on = 0
+    i_off = 0
+    prev_time = times[0]
+    next_t = prev_time
+
+    for j in range(n_times):
+        # A. Procesar OFFs en este tiempo t
+        for q in range(i_off, off_end[j]):
+            p = off_pitches[q]
+            note_count[p] -= 1
+            if note_count[p] == 0:
+                pending_off[p >> 6] |= one << np.uint64(p & 63)
+        i_off = off_end[j]
+
+        # B. Procesar ONs en este tiempo t
+        for q in range(i_on, on_end[j]):
+            p = on_pitches[q]
+            note_count[p] += 1
+            pending_on[p >> 6] |= one << np.uint64(p & 63)
+        i_on = on_end[j]
+
+        # C. Limpieza de redundancia (el ON tiene prioridad)
+        pending_off[0] &= ~pending_on[0]
+        pending_off[1] &= ~pending_on[1]
+
+        # D. Calcular Duración hacia el siguiente evento
+        is_last_event = (j == n_times - 1)
+        if not is_last_event:
+            next_t = times[j + 1]
+            dur = _snap_ticks(next_t - prev_time)
+        else:
+            dur = 0
+
+        # E. Emisión de Token
+        if (dur > 0) or is_last_event:
+            has_content = (pending_on[0] | pending_on[1] | pending_off[0] | pending_off[1]) != 0
+            if has_content or dur > 0:
+                if not is_last_event:
+                    out_on[n_out, 0] = pending_on[0]
+                    out_on[n_out, 1] = pending_on[1]
+                out_off[n_out, 0] = pending_off[0]
+                out_off[n_out, 1] = pending_off[1]
+                out_dur[n_out] = dur
+                n_out += 1
+
+                pending_on[:] = 0
+                pending_off[:] = 0
+                if not is_last_event:
+                    prev_time = next_t
+
+    return out_on[:n_out], out_off[:n_out], out_dur[:n_out]
+
+
+def _iter_bits(bits: int) -> Iterator[int]:
+    """
+    Recorre los pitches activos de una máscara de bits (bit p activo = pitch p).
+    Los bits se visitan de menor a mayor, por lo que los pitches salen ya ordenados.
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+_PITCH_STR = tuple(str(p) for p in range(128)) # Representación textual precalculada de cada pitch
+
+
+def _bits_to_str(bits: int) -> str:
+    """
+    Convierte una máscara de bits de pitches al formato 'p1,p2,...' o '_' si está vacía.
+    """
+    if not bits:
+        return "_"
+    if not bits & (bits - 1): # Caso más común: una sola nota
+        return _PITCH_STR[bits.bit_length() - 1]
+    return ",".join([_PITCH_STR[p] for p in _iter_bits(bits)])
+
+
+def _format_tokens(rows) -> List[str]:
+    """
+    Da formato de texto a los registros emitidos por el bucle de tokenización, en una sola pasada.
+
+    Args:
+        rows (Iterable[Tuple[int, int, int]]): Registros (máscara ON, máscara OFF, duración en ticks).
+
+    Returns:
+        List[str]: Lista de tokens en formato 'ON=...;OFF=...;DUR=...'.
+    """
+    return [
+        "ON=%s;OFF=%s;DUR=%.3f" % (_bits_to_str(on), _bits_to_str(off), dur / TICKS_PER_QUARTER)
+        for on, off, dur in rows
+    ]
 
 
-def _generate_tokens_from_events(raw_events, transpose_semitones=0) -> List[str]:
+def _generate_tokens_from_events(raw_events, transpose_semitones=0, timing=None) -> List[str]:
     """
     Convierte una lista de eventos crudos en una secuencia de tokens de texto estructurados.
     
@@ -122,100 +388,218 @@ def _generate_tokens_from_events(raw_events, transpose_semitones=0) -> List[str]
     Args:
         raw_events (List[Tuple]): Lista de eventos (offset, duration, pitches).
         transpose_semitones (int): Cantidad de semitonos para transportar la secuencia. Default 0.
+        timing (Tuple, optional): Esqueleto temporal de `_precompute_timing`. Se calcula si no se indica.
 
     Returns:
         List[str]: Lista de tokens en formato 'ON=...;OFF=...;DUR=...'.
     """
-    start_map = defaultdict(list)
-    end_map = defaultdict(list)
-    
+    if timing is None:
+        timing = _precompute_timing(raw_events)
+    all_times, on_ptr, on_pitches, off_ptr, off_pitches, (min_pitch, max_pitch) = timing
+
     # 1. Mapeo con Transposición
-    for offset, duration, pitches in raw_events:
-        end_time = offset + duration
-        
-        valid_pitches = []
-        for p in pitches:
-            new_p = p + transpose_semitones
-            # Protección de rango MIDI (0-127)
-            if 0 <= new_p <= 127:
-                valid_pitches.append(new_p)
-        
-        # Si quedó al menos una nota válida en el evento, lo registramos
-        if valid_pitches:
-            for p in valid_pitches:
-                start_map[offset].append(p)
-                end_map[end_time].append(p)
+    if len(all_times) == 0 or max_pitch + transpose_semitones < 0 or min_pitch + transpose_semitones > 127:
+        return [] # Todas las notas quedan fuera del rango MIDI: no hay nada que tokenizar
+
+    if min_pitch + transpose_semitones >= 0 and max_pitch + transpose_semitones <= 127:
+        # Camino rápido: ninguna nota se recorta, los segmentos del esqueleto se reutilizan tal cual
+        times = all_times
+        on_pitches = on_pitches + transpose_semitones
+        off_pitches = off_pitches + transpose_semitones
+        on_end, off_end = on_ptr[1:], off_ptr[1:]
+    else:
+        on_ptr, on_pitches = _transpose_segments(on_ptr, on_pitches, transpose_semitones)
+        off_ptr, off_pitches = _transpose_segments(off_ptr, off_pitches, transpose_semitones)
+
+        # Solo conservamos los puntos temporales con al menos una nota válida
+        time_idx = np.flatnonzero((np.diff(on_ptr) > 0) | (np.diff(off_ptr) > 0))
+        times = all_times[time_idx]
+        on_end, off_end = on_ptr[time_idx + 1], off_ptr[time_idx + 1] # Los segmentos descartados están vacíos
+
+    if _NUMBA_AVAILABLE: # Camino compilado: la máquina de estados corre completa en numba
+        out_on, out_off, out_dur = _tokenize_kernel(times, on_end, on_pitches, off_end, off_pitches)
+        return _format_tokens(
+            (on[0] | (on[1] << 64), off[0] | (off[1] << 64), dur) # Unimos las dos palabras uint64
+            for on, off, dur in zip(out_on.tolist(), out_off.tolist(), out_dur.tolist())
+        )
 
     # 2. Bucle Principal de Tokenización
-    all_times = sorted(list(set(start_map.keys()) | set(end_map.keys())))
-    if not all_times:
-        return []
+    # Cuantización vectorizada de los deltas entre puntos temporales consecutivos
+    snapped_deltas = _snap_ticks_array(np.diff(times)).tolist()
 
-    tokens = []
-    note_state = defaultdict(lambda: {'count': 0})
-    prev_time = all_times[0] 
+    rows = [] # (máscara ON, máscara OFF, duración en ticks) por token
+    note_count = [0] * 128 # Notas activas por pitch (permite solapamientos del mismo pitch)
+    times = times.tolist()
+    on_end, on_pitches = on_end.tolist(), on_pitches.tolist()
+    off_end, off_pitches = off_end.tolist(), off_pitches.tolist()
+    i_on = i_off = 0 # Punteros de los flujos ON/OFF ordenados por tiempo (solo avanzan)
+    prev_time = times[0] 
 
-    # Acumuladores de eventos pendientes para el próximo token
-    pending_on = set()
-    pending_off = set()
+    # Acumuladores de eventos pendientes para el próximo token (máscaras de bits: bit p = pitch p)
+    pending_on = 0
+    pending_off = 0
 
     # Iteramos sobre cada punto temporal donde pasa algo
-    for i, t in enumerate(all_times):
+    for i, t in enumerate(times):
         # A. Procesar OFFs en este tiempo t
-        ending_notes = end_map.get(t, [])
+        ending_notes = off_pitches[i_off:off_end[i]]
+        i_off = off_end[i]
         for p in ending_notes:
-            note_state[p]['count'] -= 1
-            if note_state[p]['count'] == 0: # Si el contador llega a 0, la nota realmente se apagó
-                pending_off.add(p)
+            note_count[p] -= 1
+            if note_count[p] == 0: # Si el contador llega a 0, la nota realmente se apagó
+                pending_off |= 1 << p
                 
         # B. Procesar ONs en este tiempo t
-        starting_notes = start_map.get(t, [])
+        starting_notes = on_pitches[i_on:on_end[i]]
+        i_on = on_end[i]
         for p in starting_notes:
-            note_state[p]['count'] += 1
-            pending_on.add(p)
+            note_count[p] += 1
+            pending_on |= 1 << p
 
         # C. Limpieza de redundancia
         # Si una nota se apaga y se prende en el mismo instante, el ON tiene prioridad
-        intersection = pending_on.intersection(pending_off)
-        for p in intersection:
-            pending_off.remove(p)
+        pending_off &= ~pending_on
 
         # D. Calcular Duración hacia el siguiente evento
-        is_last_event = (i == len(all_times) - 1)
+        is_last_event = (i == len(times) - 1)
         if not is_last_event:
-            next_t = all_times[i+1]
-            raw_dur = next_t - prev_time # Calculamos desde el último punto emitido
-            dur = snap_to_grid(raw_dur)
+            next_t = times[i+1]
+            if prev_time == t: # El último token se emitió en t: el delta ya está precalculado
+                dur = snapped_deltas[i]
+            else: # Hubo puntos absorbidos por el umbral: calculamos desde el último punto emitido
+                dur = _snap_ticks(next_t - prev_time)
         else:
-            dur = 0.0
+            dur = 0
 
         # E. Emisión de Token
         # Emitimos si hay duración válida o si es el último evento
-        if (dur > 0.0) or is_last_event:
+        if (dur > 0) or is_last_event:
             if pending_on or pending_off or dur > 0: # Solo emitimos si efectivamente hay contenido
-                if not is_last_event:
-                     str_on = ",".join(map(str, sorted(list(pending_on)))) if pending_on else "_"
-                else:
-                     str_on = "_" 
-
-                str_off = ",".join(map(str, sorted(list(pending_off)))) if pending_off else "_"
-                
-                tokens.append(f"ON={str_on};OFF={str_off};DUR={dur:.3f}") # Crear token
+                rows.append((pending_on if not is_last_event else 0, pending_off, dur)) # Registrar token
                 
                 # Resetear acumuladores y avanzar el reloj
-                pending_on = set()
-                pending_off = set()
+                pending_on = 0
+                pending_off = 0
                 if not is_last_event:
                     prev_time = next_t
                     
-    return tokens
+    return _format_tokens(rows) # Formato de texto fuera del bucle principal
+
+
+_TOKEN_RE = re.compile(r'ON=([^;]+);OFF=([^;]+);DUR=([^;]+)')
+
+
+def _parse_tokens(tokens: List[str]) -> Tuple[List[Tuple[int, ...]], List[Tuple[int, ...]], List[float]]:
+    """
+    Deserializa una secuencia de tokens a tres listas paralelas (ON, OFF, DUR) con una sola
+    expresión regular por token. Los tokens repetidos se parsean una única vez.
+    Los tokens inválidos se reportan y se tratan como vacíos (sin notas y sin avance de tiempo).
+
+    Args:
+        tokens (List[str]): Secuencia de tokens en formato 'ON=...;OFF=...;DUR=...'.
+
+    Returns:
+        Tuple[List[Tuple[int, ...]], List[Tuple[int, ...]], List[float]]: Pitches ON, pitches OFF y duración de cada token.
+    """
+    on_lists, off_lists, durs = [], [], []
+    parsed_cache = {}
+
+    for i, token in enumerate(tokens):
+        parsed = parsed_cache.get(token)
+        if parsed is None:
+            try:
+                match = _TOKEN_RE.match(token)
+                if match is None:
+                    raise ValueError("formato inválido")
+                on_part, off_part, dur_part = match.groups()
+                parsed = (
+                    tuple(int(x) for x in on_part.split(',')) if on_part != '_' else (),
+                    tuple(int(x) for x in off_part.split(',')) if off_part != '_' else (),
+                    float(dur_part),
+                )
+                if any(not 0 <= p <= 127 for p in parsed[0] + parsed[1]):
+                    raise ValueError("pitch fuera del rango MIDI (0-127)")
+                parsed_cache[token] = parsed
+            except Exception as e:
+                print(f"⚠️ Error token #{i}: {token} -> {e}")
+                parsed = ((), (), 0.0)
+
+        on_lists.append(parsed[0])
+        off_lists.append(parsed[1])
+        durs.append(parsed[2])
+
+    return on_lists, off_lists, durs
+
+
+def _read_midi_music21(midi_path: str) -> Tuple[List[Tuple[int, int, List[int]]], Dict[str, Any]]:
+    """
+    Lee un archivo MIDI con music21 y extrae sus eventos crudos y metadatos.
+
+    Args:
+        midi_path (str): Ruta del archivo MIDI a leer.
+
+    Returns:
+        Tuple[List[Tuple[int, int, List[int]]], Dict[str, Any]]: Los eventos crudos (ver `_extract_raw_events`) y la metadata ('tempo').
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=midi.translate.TranslateWarning)
+        mf = midi.MidiFile()
+        mf.open(midi_path)
+        mf.read()
+        mf.close()
+        score = midi.translate.midiFileToStream(mf, quantizePost=False) # Leemos sin cuantizar aquí para tener la data cruda real
+
+    flat_score = score.flatten() # Un único aplanado, compartido por eventos y metadata
+    raw_events = _extract_raw_events(flat_score)
+
+    meta = {'tempo': 120}
+    tempos = flat_score.getElementsByClass(tempo.MetronomeMark)
+    if tempos:
+        meta['tempo'] = int(tempos[0].number)
+
+    return raw_events, meta
+
+
+def _read_midi_symusic(midi_path: str) -> Tuple[List[Tuple[int, int, List[int]]], Dict[str, Any]]:
+    """
+    Lee un archivo MIDI con symusic (C++) sin construir un Stream de music21.
+    
+    A diferencia de music21, las notas se leen tal como están en el archivo: no se dividen en
+    notas ligadas al cruzar las barras de compás. Las pistas de percusión se descartan.
+
+    Args:
+        midi_path (str): Ruta del archivo MIDI a leer.
+
+    Returns:
+        Tuple[List[Tuple[int, int, List[int]]], Dict[str, Any]]: Los eventos crudos (en ticks de `TICKS_PER_QUARTER`) y la metadata ('tempo').
+    """
+    score = symusic.Score(midi_path)
+    scale = TICKS_PER_QUARTER / score.ticks_per_quarter
+
+    raw_events = []
+    for track in score.tracks:
+        if track.is_drum:
+            continue
+        notes = track.notes.numpy()
+        starts = np.rint(notes['time'] * scale).astype(np.int64).tolist()
+        durations = np.rint(notes['duration'] * scale).astype(np.int64).tolist()
+        pitches = notes['pitch'].tolist()
+        raw_events.extend((start, duration, [p]) for start, duration, p in zip(starts, durations, pitches))
+
+    meta = {'tempo': 120}
+    if len(score.tempos):
+        meta['tempo'] = int(round(score.tempos[0].qpm))
+
+    return raw_events, meta
 
 
 # --- Funciones Principales ---
 
 def parse_midi_to_tokens(
     midi_path: str, 
-    augment: bool = False
+    augment: bool = False,
+    max_workers: Optional[int] = 1,
+    backend: str = 'music21'
 ) -> List[Tuple[List[str], Dict[str, Any]]]:
     """
     Procesa un archivo MIDI y lo convierte en secuencias de tokens.
@@ -223,6 +607,8 @@ def parse_midi_to_tokens(
     Args:
         midi_path (str): Ruta del archivo MIDI a leer.
         augment (bool): Genera variaciones de la pieza transportándola a 12 tonalidades distintas, buscando centrarse alrededor del Do central (MIDI 60) e incluyendo la tonalidad original.
+        max_workers (int, optional): Procesos usados para tokenizar las 12 transposiciones en paralelo. Con 1 (default) se procesan en serie; con None se usan todos los núcleos disponibles (máximo 12).
+        backend (str): Lector MIDI: 'music21' (default) o 'symusic' (mucho más rápido, requiere el paquete opcional `symusic`; no divide las notas en ligaduras por compás).
 
     Returns:
         List[Tuple[List[str], Dict[str, Any]]]: Una lista donde cada elemento es una tupla:
@@ -232,29 +618,22 @@ def parse_midi_to_tokens(
         Con augment=False, la lista contiene un único elemento (tonalidad original).
         Con augment=True, retorna múltiples variaciones válidas dentro del rango MIDI.
     """
-    # 1. Carga en crudo
-    try:
-        with warnings.catch_warnings():
-            warnings.filterwarnings("ignore", category=midi.translate.TranslateWarning)
-            mf = midi.MidiFile()
-            mf.open(midi_path)
-            mf.read()
-            mf.close()
-            score = midi.translate.midiFileToStream(mf, quantizePost=False) # Leemos sin cuantizar aquí para tener la data cruda real
+    # 1. Carga en crudo y 2. Extracción de Datos Crudos + Metadata
+    if backend == 'symusic':
+        if symusic is None:
+            raise ImportError("backend='symusic' requiere el paquete opcional `symusic` (pip install symusic)")
+        reader = _read_midi_symusic
+    elif backend == 'music21':
+        reader = _read_midi_music21
+    else:
+        raise ValueError(f"backend desconocido: {backend!r} (opciones: 'music21', 'symusic')")
 
+    try:
+        raw_events, meta = reader(midi_path)
     except Exception as e:
         print(f"❌ Error leyendo MIDI {midi_path}: {e}")
         return []
 
-    # 2. Extracción de Datos Crudos
-    raw_events = _extract_raw_events(score)
-
-    # Metadata
-    meta = {'tempo': 120}
-    tempos = score.flatten().getElementsByClass(tempo.MetronomeMark)
-    if tempos:
-        meta['tempo'] = int(tempos[0].number)
-
     # 3. Generación
     if not augment:
         tokens = _generate_tokens_from_events(raw_events, transpose_semitones=0)
@@ -273,8 +652,19 @@ def parse_midi_to_tokens(
         # 3. Crear Ventana de 12 semitonos
         shifts = range(shift - 5, shift + 7)  # Privilegiamos ligeramente hacia arriba
 
-        for semitone in shifts: 
-            tokens = _generate_tokens_from_events(raw_events, transpose_semitones=semitone)
+        # 4. Esqueleto temporal compartido (invariante ante transposición)
+        timing = _precompute_timing(raw_events)
+
+        # 5. Tokenización de cada transposición (independientes entre sí)
+        tokenize = partial(_generate_tokens_from_events, raw_events, timing=timing)
+        workers = min(len(shifts), max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(tokenize, shifts))
+        else:
+            results = [tokenize(semitone) for semitone in shifts]
+
+        for tokens in results: 
             if tokens: # Solo si la transposición fue válida y generó tokens
                 augmented_data.append((tokens, meta))
         
@@ -299,53 +689,43 @@ def tokens_to_midi(tokens: List[str], metadata: Dict[str, Any], output_path: str
     MAX_NOTE_DURATION = 8.0 # Límite máximo de duración para cualquier nota
 
     # 1. Deserialización
-    current_time = 0.0
-    note_state = defaultdict(lambda: {'start': None}) # Inicio actual
+    note_starts = [None] * 128 # Inicio actual de cada pitch (None = apagado)
     collected_notes = [] # (pitch, start, duration)
 
-    for i, token in enumerate(tokens):
-        try:
-            parts = token.split(';')
-            on_part = parts[0].split('=')[1]
-            off_part = parts[1].split('=')[1]
-            dur_part = float(parts[2].split('=')[1])
-
-            # A. OFF (Cerrar notas explícitamente)
-            if off_part != '_':
-                off_pitches = [int(x) for x in off_part.split(',')]
-                for pitch in off_pitches:
-                    state = note_state[pitch]
-                    if state['start'] is not None: # Si hay inicio regristrado
-                          raw_duration = current_time - state['start']
-                          if raw_duration > 0:
-                              final_dur = min(raw_duration, MAX_NOTE_DURATION)
-                              collected_notes.append((pitch, state['start'], final_dur))
-                    state['start'] = None # Apagado
-
-            # B. ON (Abrir notas y gestionar Re-ataques)
-            if on_part != '_':
-                on_pitches = [int(x) for x in on_part.split(',')]
-                for pitch in on_pitches:
-                    state = note_state[pitch]
-                    if state['start'] is not None: # Si ya sonaba, cerramos la anterior (Reataque)
-                        raw_duration = current_time - state['start']
-                        if raw_duration > 0:
-                            final_dur = min(raw_duration, MAX_NOTE_DURATION)
-                            collected_notes.append((pitch, state['start'], final_dur))
-                    state['start'] = current_time # Iniciamos la nueva nota
-
-            current_time += dur_part  # Avanzamos el tiempo
-
-        except Exception as e:
-            print(f"⚠️ Error token #{i}: {token} -> {e}")
+    on_lists, off_lists, durs = _parse_tokens(tokens)
+
+    # Tiempo de inicio de cada token (suma acumulada de duraciones); el último valor es el final de la pieza
+    token_times = np.concatenate([[0.0], np.cumsum(durs)]).tolist()
+
+    for current_time, off_pitches, on_pitches in zip(token_times, off_lists, on_lists):
+        # A. OFF (Cerrar notas explícitamente)
+        for pitch in off_pitches:
+            start = note_starts[pitch]
+            if start is not None: # Si hay inicio regristrado
+                raw_duration = current_time - start
+                if raw_duration > 0:
+                    final_dur = min(raw_duration, MAX_NOTE_DURATION)
+                    collected_notes.append((pitch, start, final_dur))
+            note_starts[pitch] = None # Apagado
+
+        # B. ON (Abrir notas y gestionar Re-ataques)
+        for pitch in on_pitches:
+            start = note_starts[pitch]
+            if start is not None: # Si ya sonaba, cerramos la anterior (Reataque)
+                raw_duration = current_time - start
+                if raw_duration > 0:
+                    final_dur = min(raw_duration, MAX_NOTE_DURATION)
+                    collected_notes.append((pitch, start, final_dur))
+            note_starts[pitch] = current_time # Iniciamos la nueva nota
 
     # 2. Limpieza final (Notas que nunca recibieron OFF)
-    for pitch, state in note_state.items():
-        if state['start'] is not None:
-            raw_duration = current_time - state['start']
+    current_time = token_times[-1]
+    for pitch, start in enumerate(note_starts):
+        if start is not None:
+            raw_duration = current_time - start
             final_dur = min(raw_duration, MAX_NOTE_DURATION)
             if final_dur > 0:
-                collected_notes.append((pitch, state['start'], final_dur))
+                collected_notes.append((pitch, start, final_dur))
     
     # 3. Escritura con music21
     
@@ -358,10 +738,12 @@ def tokens_to_midi(tokens: List[str], metadata: Dict[str, Any], output_path: str
     p.insert(0, tempo.MetronomeMark(number=bpm))
     p.insert(0, instrument.Piano())
     
+    # Inserción en bloque: `coreInsert` evita actualizar el estado del Stream por cada nota,
+    # y `coreElementsChanged` lo actualiza una única vez al final
+    # La duración se pasa al constructor para no crear y luego reemplazar la Duration por defecto
     for pitch, start, dur in collected_notes:
-        n = note.Note(pitch)
-        n.quarterLength = dur
-        p.insert(start, n)
+        p.coreInsert(start, note.Note(pitch, quarterLength=dur), ignoreSort=True)
+    p.coreElementsChanged()
 
     s.append(p)
     try: